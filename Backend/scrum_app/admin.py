@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Employee, Project, StandupEntry
+from .models import Employee, Project, StandupEntry, StandupConversation
 
 admin.site.register(Employee)
 admin.site.register(Project)
 admin.site.register(StandupEntry)
+admin.site.register(StandupConversation)
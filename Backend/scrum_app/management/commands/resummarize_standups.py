@@ -0,0 +1,171 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from scrum_app.models import StandupConversation, StandupEntry
+from scrum_app.utils import (
+    summarize_standup_conversation, create_standup_entries,
+    FakeCompletionClient, SUMMARY_MODEL, SUMMARY_PROMPT_VERSION,
+)
+
+
+class Command(BaseCommand):
+    help = ("Re-summarize stored standup conversations for a date range with the current "
+            "prompt, replacing their entries and recording the prompt/model version.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day to include (YYYY-MM-DD)")
+        parser.add_argument('--end', help="Last day to include (YYYY-MM-DD)")
+        parser.add_argument('--project', action='append', dest='projects', default=[],
+                            help="project_id to include; repeat for several (default: all)")
+        parser.add_argument('--workers', type=int, default=4,
+                            help="Maximum number of summarization calls in flight")
+        parser.add_argument('--model', default=SUMMARY_MODEL,
+                            help="Model to summarize with (ignored with --fake, which uses 'fake')")
+        parser.add_argument('--checkpoint', default='resummarize_checkpoint.json',
+                            help="File recording finished conversation ids")
+        parser.add_argument('--resume', action='store_true',
+                            help="Skip conversations already listed in the checkpoint")
+        parser.add_argument('--force', action='store_true',
+                            help="Also redo conversations already at the current prompt/model version")
+        parser.add_argument('--fake', action='store_true',
+                            help="Use the offline FakeCompletionClient instead of OpenAI; "
+                                 "entries are tagged with model 'fake' (for tests and benchmarking)")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        if options['fake']:
+            # Tag fake output with its own model name so a later real run
+            # never mistakes it for an up-to-date summary.
+            client = FakeCompletionClient()
+            model = client.model_name
+        else:
+            client = None
+            model = options['model']
+        start = self.parse_date(options['start']) if options['start'] else None
+        end = self.parse_date(options['end']) if options['end'] else None
+        if start and end and start > end:
+            raise CommandError(f"--start {start} is after --end {end}")
+        checkpoint_path = options['checkpoint']
+        done = self.load_checkpoint(checkpoint_path, model) if options['resume'] else set()
+
+        conversations = StandupConversation.objects.filter(project__isnull=False)
+        if start:
+            conversations = conversations.filter(date__date__gte=start)
+        if end:
+            conversations = conversations.filter(date__date__lte=end)
+        if options['projects']:
+            conversations = conversations.filter(project__project_id__in=options['projects'])
+        if not options['force']:
+            current = StandupEntry.objects.filter(prompt_version=SUMMARY_PROMPT_VERSION,
+                                                  model_name=model)
+            conversations = conversations.exclude(entries__in=current)
+
+        # Employees are prefetched because create_standup_entries matches each entry by name.
+        conversations = (conversations.select_related('project')
+                         .prefetch_related('project__employees').order_by('date'))
+        pending = [c for c in conversations if c.id not in done]
+        # Nothing to summarize in a transcript without user turns (e.g. an /end/
+        # call with an empty conversation), so don't send it to the model.
+        empty = [c for c in pending if not self.has_user_turns(c.messages)]
+        pending = [c for c in pending if self.has_user_turns(c.messages)]
+        self.stdout.write(f"Re-summarizing {len(pending)} conversations with prompt "
+                          f"{SUMMARY_PROMPT_VERSION} / {model} ({options['workers']} workers), "
+                          f"skipping {len(empty)} without user turns")
+
+        processed = failed = 0
+        started = time.monotonic()
+        queue = iter(pending)
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            # Keep at most `workers` calls queued beyond the running ones so a
+            # large range doesn't submit everything up front.
+            def submit_next():
+                conversation = next(queue, None)
+                if conversation is not None:
+                    future = executor.submit(summarize_standup_conversation,
+                                             conversation.messages, client, model)
+                    in_flight[future] = conversation
+
+            for _ in range(options['workers'] * 2):
+                submit_next()
+
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    conversation = in_flight.pop(future)
+                    submit_next()
+                    try:
+                        standup_data = future.result()
+                        if not standup_data:
+                            raise ValueError("model output had no standup entries")
+                        if (not isinstance(standup_data, list)
+                                or not all(isinstance(entry, dict) for entry in standup_data)):
+                            raise ValueError(f"unexpected model output: {standup_data!r}")
+
+                        # DB writes stay on this thread; workers only call the model.
+                        self.replace_entries(conversation, standup_data, model)
+                    except Exception as e:
+                        # Leave the old entries in place; a later --resume retries it.
+                        failed += 1
+                        self.stderr.write(f"Conversation {conversation.id}: {e}")
+                        continue
+
+                    done.add(conversation.id)
+                    self.save_checkpoint(checkpoint_path, model, done)
+                    processed += 1
+
+        minutes = (time.monotonic() - started) / 60
+        rate = processed / minutes if minutes else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-summarized {processed} conversations ({failed} failed) "
+            f"in {minutes * 60:.1f}s - {rate:.1f} conversations/minute"))
+
+    def replace_entries(self, conversation, standup_data, model):
+        with transaction.atomic():
+            conversation.entries.all().delete()
+            entries = create_standup_entries(conversation.project, standup_data, conversation, model)
+            # StandupEntry.date is auto_now_add, which ignores any value passed to
+            # create(), so the new entries are backdated with a separate update().
+            StandupEntry.objects.filter(pk__in=[e.pk for e in entries]).update(date=conversation.date)
+
+    def has_user_turns(self, messages):
+        return any(isinstance(msg, dict) and msg.get("role") == "user" and msg.get("content")
+                   for msg in messages or [])
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    def load_checkpoint(self, path, model):
+        if not os.path.exists(path):
+            return set()
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read checkpoint {path}: {e}")
+        if not isinstance(checkpoint, dict):
+            raise CommandError(f"Checkpoint {path} is not a valid checkpoint file")
+        if (checkpoint.get("prompt_version"), checkpoint.get("model")) != (SUMMARY_PROMPT_VERSION, model):
+            raise CommandError(f"Checkpoint {path} was written for prompt "
+                               f"{checkpoint.get('prompt_version')} / {checkpoint.get('model')}; "
+                               f"remove it or run without --resume")
+        return set(checkpoint.get("done", []))
+
+    def save_checkpoint(self, path, model, done):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"prompt_version": SUMMARY_PROMPT_VERSION, "model": model,
+                       "done": sorted(done)}, f)
+        os.replace(tmp_path, path)
@@ -22,15 +22,28 @@ class Project(models.Model):
         return f"{self.project_name} ({self.project_id})"
 
 
+class StandupConversation(models.Model):
+    date = models.DateTimeField(auto_now_add=True)
+    project = models.ForeignKey('Project', on_delete=models.SET_NULL, null=True, blank=True)
+    messages = models.JSONField(default=list)  # raw [{role, content}, ...] transcript
+
+    def __str__(self):
+        return f"{self.date.date()} - {self.project.project_name if self.project else 'Unknown'}"
+
+
 class StandupEntry(models.Model):
     date = models.DateTimeField(auto_now_add=True)
     project = models.ForeignKey('Project', on_delete=models.SET_NULL, null=True, blank=True)
     employee = models.ForeignKey('Employee', on_delete=models.SET_NULL, null=True, blank=True)
+    conversation = models.ForeignKey('StandupConversation', on_delete=models.SET_NULL,
+                                     null=True, blank=True, related_name='entries')
 
     completed_yesterday = models.TextField(blank=True)
     plan_today = models.TextField(blank=True)
     blockers = models.TextField(blank=True)
     summary = models.TextField(blank=True)
+    prompt_version = models.CharField(max_length=50, blank=True)
+    model_name = models.CharField(max_length=100, blank=True)
 
     def __str__(self):
         return f"{self.date.date()} - {self.employee.employee_name if self.employee else 'Unknown'}"
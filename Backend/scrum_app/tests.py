@@ -1,3 +1,237 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Employee, Project, StandupEntry, StandupConversation
+from .utils import (
+    summarize_standup_conversation, FakeCompletionClient, SUMMARY_PROMPT_VERSION,
+)
+
+
+def make_conversation(project, day, *user_turns):
+    messages = [{"role": "assistant", "content": "What did you do yesterday?"}]
+    messages += [{"role": "user", "content": turn} for turn in user_turns]
+    conversation = StandupConversation.objects.create(project=project, messages=messages)
+    # `date` is auto_now_add, so move it to the wanted day after creation.
+    StandupConversation.objects.filter(pk=conversation.pk).update(
+        date=datetime(2025, 1, day, 12, 0, tzinfo=timezone.utc))
+    conversation.refresh_from_db()
+    return conversation
+
+
+class FakeCompletionClientTests(TestCase):
+
+    def test_multiline_user_turns_are_kept(self):
+        conversation = [
+            {"role": "assistant", "content": "Hi"},
+            {"role": "user", "content": "did a\nmulti"},
+            {"role": "user", "content": "plan"},
+        ]
+        standup_list = summarize_standup_conversation(conversation, FakeCompletionClient("Ann"))
+
+        self.assertEqual(len(standup_list), 1)
+        self.assertEqual(standup_list[0]["name"], "Ann")
+        self.assertEqual(standup_list[0]["completed_yesterday"], "did a\nmulti")
+        self.assertEqual(standup_list[0]["plan_today"], "plan")
+
+    def test_conversation_without_user_turns_gives_no_entries(self):
+        self.assertEqual(summarize_standup_conversation([], FakeCompletionClient()), [])
+        self.assertEqual(summarize_standup_conversation(
+            [{"role": "assistant", "content": "Hi"}], FakeCompletionClient()), [])
+
+
+class ResummarizeStandupsTests(TestCase):
+
+    def setUp(self):
+        self.employee = Employee.objects.create(employee_name="Ann Lee", employee_id="E1", role="Dev")
+        self.project = Project.objects.create(project_id="P1", project_name="Alpha")
+        self.project.employees.add(self.employee)
+        self.other_project = Project.objects.create(project_id="P2", project_name="Beta")
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.checkpoint = os.path.join(tmp_dir.name, "checkpoint.json")
+
+    def run_command(self, *args):
+        out, err = StringIO(), StringIO()
+        # Name the fake's participant after the project's employee so entries match them.
+        with mock.patch("scrum_app.management.commands.resummarize_standups.FakeCompletionClient",
+                        lambda: FakeCompletionClient(self.employee.employee_name)):
+            call_command("resummarize_standups", "--fake", "--checkpoint", self.checkpoint,
+                         *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def write_checkpoint(self, **checkpoint):
+        with open(self.checkpoint, "w") as f:
+            json.dump(checkpoint, f)
+
+    def add_old_entry(self, conversation):
+        return StandupEntry.objects.create(project=conversation.project, conversation=conversation,
+                                           summary="old", prompt_version="v0", model_name="gpt-4")
+
+    def test_filters_by_date_range_and_project(self):
+        before = make_conversation(self.project, 1, "early")
+        inside = make_conversation(self.project, 5, "inside")
+        after = make_conversation(self.project, 10, "late")
+        other = make_conversation(self.other_project, 5, "other project")
+
+        self.run_command("--start", "2025-01-02", "--end", "2025-01-09", "--project", "P1")
+
+        self.assertTrue(inside.entries.exists())
+        for conversation in (before, after, other):
+            self.assertFalse(conversation.entries.exists())
+
+    def test_entries_replaced_and_backdated(self):
+        conversation = make_conversation(self.project, 3, "did x", "do y")
+        old = self.add_old_entry(conversation)
+
+        out, _ = self.run_command()
+
+        self.assertFalse(StandupEntry.objects.filter(pk=old.pk).exists())
+        entry = conversation.entries.get()
+        self.assertEqual(entry.date, conversation.date)
+        self.assertEqual(entry.employee, self.employee)
+        self.assertEqual(entry.completed_yesterday, "did x")
+        self.assertEqual(entry.plan_today, "do y")
+        self.assertIn("conversations/minute", out)
+
+    def test_records_prompt_version_and_fake_model(self):
+        conversation = make_conversation(self.project, 3, "did x")
+
+        self.run_command()
+
+        entry = conversation.entries.get()
+        self.assertEqual(entry.prompt_version, SUMMARY_PROMPT_VERSION)
+        self.assertEqual(entry.model_name, FakeCompletionClient.model_name)
+
+    def test_skips_conversations_at_current_version_unless_forced(self):
+        conversation = make_conversation(self.project, 3, "did x")
+        self.run_command()
+        first_pk = conversation.entries.get().pk
+
+        out, _ = self.run_command()
+        self.assertIn("Re-summarizing 0 conversations", out)
+        self.assertEqual(conversation.entries.get().pk, first_pk)
+
+        out, _ = self.run_command("--force")
+        self.assertIn("Re-summarizing 1 conversations", out)
+        self.assertNotEqual(conversation.entries.get().pk, first_pk)
+
+    def test_resume_skips_checkpointed_conversations(self):
+        finished = make_conversation(self.project, 3, "did x")
+        pending = make_conversation(self.project, 4, "did y")
+        old = self.add_old_entry(finished)
+        self.write_checkpoint(prompt_version=SUMMARY_PROMPT_VERSION,
+                              model=FakeCompletionClient.model_name, done=[finished.id])
+
+        self.run_command("--resume")
+
+        self.assertEqual(list(finished.entries.all()), [old])
+        self.assertTrue(pending.entries.exists())
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)["done"], sorted([finished.id, pending.id]))
+
+    def test_resume_rejects_checkpoint_from_other_version(self):
+        make_conversation(self.project, 3, "did x")
+        self.write_checkpoint(prompt_version="v0", model=FakeCompletionClient.model_name, done=[])
+
+        with self.assertRaises(CommandError):
+            self.run_command("--resume")
+
+    def test_resume_rejects_corrupt_checkpoint(self):
+        with open(self.checkpoint, "w") as f:
+            f.write('{"prompt_version": "v1", "do')
+
+        with self.assertRaises(CommandError):
+            self.run_command("--resume")
+
+    def test_rejects_inverted_date_range(self):
+        with self.assertRaises(CommandError):
+            self.run_command("--start", "2025-01-09", "--end", "2025-01-02")
+
+    def test_worker_exception_counts_as_failed_and_keeps_old_entries(self):
+        broken = make_conversation(self.project, 3, "boom")
+        working = make_conversation(self.project, 4, "did y")
+        old = self.add_old_entry(broken)
+
+        def summarize(conversation, client, model):
+            if conversation[-1]["content"] == "boom":
+                raise RuntimeError("API down")
+            return summarize_standup_conversation(conversation, client, model)
+
+        with mock.patch("scrum_app.management.commands.resummarize_standups"
+                        ".summarize_standup_conversation", side_effect=summarize):
+            out, err = self.run_command()
+
+        self.assertIn("(1 failed)", out)
+        self.assertIn("API down", err)
+        self.assertEqual(list(broken.entries.all()), [old])
+        self.assertTrue(working.entries.exists())
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)["done"], [working.id])
+
+    def test_conversations_without_user_turns_are_skipped(self):
+        empty = make_conversation(self.project, 3)
+        working = make_conversation(self.project, 4, "did y")
+
+        with mock.patch("scrum_app.management.commands.resummarize_standups"
+                        ".summarize_standup_conversation",
+                        wraps=summarize_standup_conversation) as summarize:
+            out, err = self.run_command()
+
+        self.assertEqual(summarize.call_count, 1)
+        self.assertIn("skipping 1 without user turns", out)
+        self.assertIn("(0 failed)", out)
+        self.assertEqual(err, "")
+        self.assertFalse(empty.entries.exists())
+        self.assertTrue(working.entries.exists())
+
+    def test_bad_model_output_does_not_stop_the_batch(self):
+        nulls = make_conversation(self.project, 3, "nulls")
+        strings = make_conversation(self.project, 4, "strings")
+        working = make_conversation(self.project, 5, "did y")
+        old = self.add_old_entry(strings)
+
+        def summarize(conversation, client, model):
+            content = conversation[-1]["content"]
+            if content == "nulls":
+                return [{"name": None, "completed_yesterday": None, "plan_today": None,
+                         "blockers": None, "summary": None}]
+            if content == "strings":
+                return ["not", "an", "entry"]
+            return summarize_standup_conversation(conversation, client, model)
+
+        with mock.patch("scrum_app.management.commands.resummarize_standups"
+                        ".summarize_standup_conversation", side_effect=summarize):
+            out, err = self.run_command()
+
+        self.assertIn("Re-summarized 2 conversations (1 failed)", out)
+        self.assertIn(f"Conversation {strings.id}", err)
+        self.assertEqual(list(strings.entries.all()), [old])
+        entry = nulls.entries.get()
+        self.assertEqual(entry.completed_yesterday, "Not specified")
+        self.assertEqual(entry.blockers, "None")
+        self.assertEqual(entry.summary, "")
+        self.assertTrue(working.entries.exists())
+
+
+class EndConversationViewTests(TestCase):
+
+    def test_transcript_saved_when_summary_fails(self):
+        Project.objects.create(project_id="P1", project_name="Alpha")
+        conversation = [{"role": "user", "content": "did x"}]
+
+        with mock.patch("scrum_app.views.summarize_standup_conversation",
+                        side_effect=RuntimeError("API down")):
+            response = self.client.post("/end/", {"project_id": "P1", "conversation": conversation},
+                                        content_type="application/json")
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(StandupConversation.objects.get().messages, conversation)
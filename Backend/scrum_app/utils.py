@@ -3,17 +3,62 @@ from datetime import datetime
 import pandas as pd
 import os
 import json
+import re
+from types import SimpleNamespace
+from .models import StandupEntry
 
 
+# Bump SUMMARY_PROMPT_VERSION whenever the prompt below changes, so entries
+# produced by older prompts can be found and re-summarized.
+SUMMARY_PROMPT_VERSION = "v1"
+SUMMARY_MODEL = "gpt-4"  # or "gpt-4o" if you have access
 
-def summarize_standup_conversation(conversation):
+
+class FakeCompletionClient:
+    """
+    Offline stand-in for the openai module (exposes chat.completions.create).
+    Returns one deterministic entry built from the conversation's user turns
+    (none for a conversation without user turns), so the batch re-summarization
+    can run without network access. Entries it produces are tagged `model_name`.
+    """
+
+    model_name = "fake"
+
+    def __init__(self, name="Unknown"):
+        self.name = name
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        conversation_text = prompt.split("Conversation:\n", 1)[-1].rstrip("\n")
+        # Each turn is rendered as "role: content"; continuation lines belong to the previous turn.
+        turns = re.split(r"^(user|assistant|system): ", conversation_text, flags=re.MULTILINE)[1:]
+        user_turns = [content.rstrip("\n") for role, content in zip(turns[::2], turns[1::2])
+                      if role == "user"]
+
+        standup_list = []
+        if user_turns:
+            standup_list.append({
+                "name": self.name,
+                "completed_yesterday": user_turns[0],
+                "plan_today": user_turns[1] if len(user_turns) > 1 else "Not specified",
+                "blockers": user_turns[2] if len(user_turns) > 2 else "None",
+                "summary": " ".join(user_turns),
+            })
+        message = SimpleNamespace(content=json.dumps(standup_list))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def summarize_standup_conversation(conversation, client=None, model=SUMMARY_MODEL):
     """
     Given the whole conversation (list of {role, content}), ask GPT to extract a list of standup entries:
     [
       {"name":"John", "completed_yesterday":"...", "plan_today":"...", "blockers":"...", "summary":"..."},
       {...}
     ]
+    `client` defaults to the openai module; pass a FakeCompletionClient to run offline.
     """
+    client = client or openai
     conversation_text = "\n".join([f"{msg['role']}: {msg['content']}" for msg in conversation])
 
     prompt = f"""Analyze this standup conversation and extract each participant's standup items.
@@ -39,8 +84,8 @@ Conversation:
 {conversation_text}
 """
 
-    response = openai.chat.completions.create(
-        model="gpt-4",  # or "gpt-4o" if you have access
+    response = client.chat.completions.create(
+        model=model,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.3  # Lower temperature for more consistent JSON output
     )
@@ -64,8 +109,34 @@ Conversation:
         print("Raw:", response_text)
         # fallback: return minimal placeholder for each member? Return empty list here.
         return []
-    
-    
+
+
+def create_standup_entries(project, standup_data, conversation=None, model=SUMMARY_MODEL):
+    """
+    Save the summarized entries for a project, matching employees by name and
+    tagging each entry with the prompt version and model that produced it.
+    """
+    entries = []
+    for entry in standup_data:
+        employee = next(
+            (e for e in project.employees.all()
+             if e.employee_name.lower() == str(entry.get("name") or "").lower()),
+            None)
+
+        entries.append(StandupEntry.objects.create(
+            project=project,
+            employee=employee,
+            conversation=conversation,
+            completed_yesterday=entry.get("completed_yesterday") or "Not specified",
+            plan_today=entry.get("plan_today") or "Not specified",
+            blockers=entry.get("blockers") or "None",
+            summary=entry.get("summary") or "",
+            prompt_version=SUMMARY_PROMPT_VERSION,
+            model_name=model
+        ))
+    return entries
+
+
 def save_standup_data(standup_list, excel_target):
     if not standup_list:
         return
@@ -3,12 +3,12 @@ from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser
 from rest_framework import status
 from django.http import JsonResponse, HttpResponse
-from .utils import summarize_standup_conversation, save_standup_data
+from .utils import summarize_standup_conversation, save_standup_data, create_standup_entries
 import openai, tempfile, os, base64
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from .serializers import ProjectSerializer, ProjectNameOnlySerializer
-from .models import Project, Employee, StandupEntry
+from .models import Project, Employee, StandupEntry, StandupConversation
 import pandas as pd
 from django.utils.timezone import localtime
 from django.core.files import File
@@ -40,6 +40,11 @@ class EndConversationView(APIView):
             except Project.DoesNotExist:
                 return Response({"error": "Project not found"}, status=404)
 
+            # ✅ Save the raw transcript first so it survives a failed summary
+            standup_conversation = StandupConversation.objects.create(
+                project=project,
+                messages=conversation)
+
             # Call GPT to summarize
             standup_data = summarize_standup_conversation(conversation)
 
@@ -74,20 +79,7 @@ class EndConversationView(APIView):
                 save_standup_data(standup_data, excel_path)
 
             # ✅ Save entries to DB
-            for entry in standup_data:
-                employee = next(
-                    (e for e in project.employees.all()
-                     if e.employee_name.lower() == entry["name"].lower()),
-                    None)
-
-                StandupEntry.objects.create(
-                    project=project,
-                    employee=employee,
-                    completed_yesterday=entry.get("completed_yesterday", "Not specified"),
-                    plan_today=entry.get("plan_today", "Not specified"),
-                    blockers=entry.get("blockers", "None"),
-                    summary=entry.get("summary", "")
-                )
+            create_standup_entries(project, standup_data, standup_conversation)
 
             return Response({
                 "message": "Standup meeting saved successfully",